@@ -1,7 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_submodules
 
-hiddenimports = ['pyvisa', 'pyvisa.resources', 'pyvisa.resources.gpib', 'pyvisa.resources.serial', 'pyvisa.resources.usb', 'openpyxl', 'openpyxl.styles', 'openpyxl.chart', 'matplotlib.backends.backend_tkagg', 'numpy']
+hiddenimports = ['pyvisa', 'pyvisa.resources', 'pyvisa.resources.gpib', 'pyvisa.resources.serial', 'pyvisa.resources.usb', 'openpyxl', 'openpyxl.styles', 'openpyxl.chart', 'xlsxwriter', 'pyarrow', 'pyarrow.parquet', 'matplotlib.backends.backend_tkagg', 'numpy']
 hiddenimports += collect_submodules('matplotlib')
 
 
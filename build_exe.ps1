@@ -28,7 +28,7 @@ if ($LASTEXITCODE -ne 0) {
 
 # ── 3. Install required packages ────────────────────────────
 Write-Host "Installing dependencies..." -ForegroundColor Cyan
-pip install pyvisa matplotlib openpyxl numpy -q
+pip install pyvisa matplotlib openpyxl xlsxwriter pyarrow numpy -q
 
 # ── 4. Run PyInstaller ───────────────────────────────────────
 Write-Host "`nBuilding EXE..." -ForegroundColor Cyan
@@ -46,6 +46,9 @@ python -m PyInstaller `
     --hidden-import "openpyxl" `
     --hidden-import "openpyxl.styles" `
     --hidden-import "openpyxl.chart" `
+    --hidden-import "xlsxwriter" `
+    --hidden-import "pyarrow" `
+    --hidden-import "pyarrow.parquet" `
     --hidden-import "matplotlib.backends.backend_tkagg" `
     --hidden-import "numpy" `
     --collect-submodules "matplotlib" `
@@ -5,11 +5,13 @@ Funktionen:
   - Gerätekonfiguration (Messfunktion, Bereich, Auflösung, Triggermodus)
   - Kontinuierliche Messung mit einstellbarem Intervall
   - Grafische Darstellung mit optionaler Autoskalierung
-  - Datenspeicherung im Excel-Format (.xlsx)
+  - Datenspeicherung im Excel-Format (.xlsx), als CSV oder Parquet
   - Simulation wenn kein Gerät angeschlossen ist
 
 Voraussetzungen:
   pip install pyvisa matplotlib openpyxl numpy tkinter
+  optional: pip install xlsxwriter  (schnellerer Excel-Export)
+            pip install pyarrow     (Parquet-Export)
 """
 
 import tkinter as tk
@@ -17,15 +19,24 @@ from tkinter import ttk, messagebox, filedialog
 import threading
 import time
 import datetime
-import queue
-import random
+import collections
+import concurrent.futures
+import io
 import math
+import os
+import functools
+import importlib.util
+import types
 
 import matplotlib
 matplotlib.use("TkAgg")
+# Kurvensegmente unterhalb ~1 Pixel beim Rastern zusammenfassen
+matplotlib.rcParams["path.simplify"] = True
+matplotlib.rcParams["path.simplify_threshold"] = 1.0
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
+from matplotlib import animation
 import numpy as np
 
 try:
@@ -34,13 +45,38 @@ try:
 except ImportError:
     PYVISA_AVAILABLE = False
 
-try:
+# Export-Bibliotheken werden erst beim Speichern importiert (zusammen gut
+# 0,5 s Startzeit); hier nur prüfen, ob sie installiert sind
+OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+XLSXWRITER_AVAILABLE = importlib.util.find_spec("xlsxwriter") is not None
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+@functools.cache
+def _openpyxl() -> types.SimpleNamespace:
+    """openpyxl beim ersten Gebrauch laden; die Excel-Stile werden dabei
+    einmalig angelegt und für alle Zellen wiederverwendet."""
     import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    from openpyxl.chart import LineChart, Reference
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import (Font, PatternFill, Alignment, Border, Side,
+                                 NamedStyle)
+    from openpyxl.chart import LineChart, Reference, Series
+    from openpyxl.drawing.image import Image
+    thin = Side(style="thin", color="45475a")
+    return types.SimpleNamespace(
+        Workbook=openpyxl.Workbook, WriteOnlyCell=WriteOnlyCell,
+        NamedStyle=NamedStyle, LineChart=LineChart, Reference=Reference,
+        Series=Series, Image=Image,
+        TITLE_FONT=Font(name="Calibri", bold=True, color="89B4FA", size=14),
+        HEADER_FONT=Font(name="Calibri", bold=True, color="FFFFFF", size=11),
+        HEADER_FILL=PatternFill("solid", fgColor="1e3a5f"),
+        META_FONT=Font(bold=True, color="74C7EC"),
+        STAT_TITLE_FONT=Font(bold=True, color="A6E3A1", size=11),
+        BOLD_FONT=Font(bold=True),
+        CENTER=Alignment(horizontal="center"),
+        EVEN_FILL=PatternFill("solid", fgColor="1e1e2e"),
+        BORDER=Border(left=thin, right=thin, top=thin, bottom=thin),
+    )
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Geräteschnittstelle
@@ -90,11 +126,30 @@ class Multimeter34401A:
         "Durchgang": "Ω",   "Diode": "V",
     }
 
+    # Simulation: Funktion → (Grundwert, Rauschen σ, gleichgerichtet)
+    SIM_PARAMS = {
+        "DC Spannung":   (5.0, 5.0 * 0.002, False),
+        "AC Spannung":   (230.0, 230.0 * 0.002, True),
+        "DC Strom":      (0.1, 0.1 * 0.005, False),
+        "AC Strom":      (0.5, 0.5 * 0.005, False),
+        "2W Widerstand": (1000.0, 0.5, False),
+        "4W Widerstand": (1000.0, 0.5, False),
+        "Frequenz":      (50.0, 0.01, False),
+        "Periode":       (0.02, 1e-6, False),
+    }
+
     def __init__(self):
         self.instrument = None
         self.simulation = True
         self._sim_phase = 0.0
         self._sim_func = "DC Spannung"
+        self._rng = np.random.default_rng()
+        self._noise: list = []          # Rauschvorrat (σ = 1) für Einzelwerte
+        self._noise_i = 0
+        self._sim_params_cached = self.SIM_PARAMS["DC Spannung"]
+        self._t_int = 0.02          # Integrationszeit je Messung (s)
+        self._block_cfg = None      # zuletzt gesendete (SAMP:COUN, TRIG:DEL)
+        self._cfg_key = None        # zuletzt gesendete (Funktion, Bereich, Aufl.)
 
     # ── Verbindung ──────────────────────────────────────────────────────────
 
@@ -115,11 +170,16 @@ class Multimeter34401A:
             rm = pyvisa.ResourceManager()
             self.instrument = rm.open_resource(resource_string)
             self.instrument.timeout = 5000
+            # Große Lesepuffer für Blockantworten (FETCH? mit vielen Werten)
+            self.instrument.chunk_size = 65536
             idn = self.instrument.query("*IDN?")
             if "34401" not in idn and "34410" not in idn:
                 raise ValueError(f"Unbekanntes Gerät: {idn}")
             self.instrument.write("*RST")
             self.instrument.write("*CLS")
+            self._cfg_key = None
+            if resource_string.upper().startswith("ASRL"):
+                self.instrument.write("SYST:REM")   # nur über RS-232 erlaubt
             self.simulation = False
             return True
         except Exception as e:
@@ -136,6 +196,7 @@ class Multimeter34401A:
                 pass
             self.instrument = None
         self.simulation = True
+        self._cfg_key = None
 
     # ── Konfiguration ───────────────────────────────────────────────────────
 
@@ -143,24 +204,52 @@ class Multimeter34401A:
         func_cmd = self.FUNCTIONS.get(function, "VOLT:DC")
         nplc = self.NPLC_MAP.get(resolution, 1)
         self._sim_func = function
+        self._sim_params_cached = self.SIM_PARAMS.get(function, (0.0, 0.001, False))
+        uses_nplc = function not in ("Durchgang", "Diode", "Frequenz", "Periode")
+        self._t_int = nplc / 50.0 if uses_nplc else 0.0
 
         if self.simulation:
+            self._block_cfg = None
+            return
+
+        # Unveränderte Einstellung nicht erneut senden (je Befehl ein
+        # VISA-Umlauf), nur einen Blockmodus auf Einzelwerte zurückstellen
+        key = (function, range_str, resolution)
+        if key == self._cfg_key:
+            if self._block_cfg is not None:
+                self.instrument.write("TRIG:DEL:AUTO ON")
+                self.instrument.write("SAMP:COUN 1")
+                self._block_cfg = None
             return
 
         range_val = "DEF" if range_str in ("AUTO", "–") else self._parse_range(range_str)
         self.instrument.write(f"CONF:{func_cmd} {range_val}")
-        if function not in ("Durchgang", "Diode", "Frequenz", "Periode"):
+        if uses_nplc:
             self.instrument.write(f"SENS:{func_cmd}:NPLC {nplc}")
         self.instrument.write("TRIG:SOUR IMM")
         self.instrument.write("TRIG:DEL:AUTO ON")
         self.instrument.write("SAMP:COUN 1")
+        self._block_cfg = None
+        self._cfg_key = key
+
+    # Einheiten-Suffixe, längste zuerst (sonst passt "V" auch auf "MV")
+    _RANGE_SUFFIXES = tuple(sorted(
+        {"MV": 1e-3, "V": 1, "MA": 1e-3, "A": 1,
+         "Ω": 1, "KΩ": 1e3, "MΩ": 1e6, "HZ": 1}.items(),
+        key=lambda x: -len(x[0])))
+    _RANGE_LUT: dict[str, str] = {}     # Bereichstext → SCPI-Wert
+
+    @classmethod
+    def _parse_range(cls, s: str) -> str:
+        val = cls._RANGE_LUT.get(s)
+        if val is None:
+            val = cls._RANGE_LUT[s] = cls._parse_suffix(s)
+        return val
 
-    @staticmethod
-    def _parse_range(s: str) -> str:
+    @classmethod
+    def _parse_suffix(cls, s: str) -> str:
         s = s.replace(" ", "").upper()
-        multipliers = {"MV": 1e-3, "V": 1, "MA": 1e-3, "A": 1,
-                       "Ω": 1, "KΩ": 1e3, "MΩ": 1e6, "HZ": 1}
-        for suffix, mult in sorted(multipliers.items(), key=lambda x: -len(x[0])):
+        for suffix, mult in cls._RANGE_SUFFIXES:
             if s.endswith(suffix):
                 try:
                     return str(float(s[:-len(suffix)]) * mult)
@@ -179,27 +268,400 @@ class Multimeter34401A:
         except Exception:
             return float("nan")
 
+    def measure_block(self, n: int, interval: float) -> np.ndarray:
+        """n Messwerte mit einer Übertragung (INIT + FETCH?) statt n × READ?.
+
+        Der Abstand der Werte wird über die Triggerverzögerung im Gerät auf
+        ungefähr `interval` Sekunden eingestellt.
+        """
+        if self.simulation:
+            return self._simulate_batch(n)
+        try:
+            cfg = (n, round(max(interval - self._t_int, 0.0), 4))
+            if cfg != self._block_cfg:
+                self.instrument.write(f"SAMP:COUN {cfg[0]}")
+                self.instrument.write(f"TRIG:DEL {cfg[1]}")
+                self._block_cfg = cfg
+            self.instrument.write("INIT")
+            result = self.instrument.query("FETCH?")
+            return np.array(result.strip().split(","), dtype=np.float64)
+        except Exception:
+            return np.full(n, np.nan)
+
+    NOISE_POOL = 8192
+
     def _simulate(self) -> float:
+        # Einzelwerte aus einem vorab gefüllten Vorrat statt eines
+        # Generator-Aufrufs je Messung
+        i = self._noise_i
+        if i >= len(self._noise):
+            self._noise = self._rng.standard_normal(self.NOISE_POOL).tolist()
+            i = 0
+        self._noise_i = i + 1
         self._sim_phase += 0.1
-        f = self._sim_func
-        if "Spannung" in f:
-            base = 5.0 if "DC" in f else 230.0
-            noise = random.gauss(0, base * 0.002)
-            val = base + noise
-            if "AC" in f:
-                val = abs(val)
-        elif "Strom" in f:
-            base = 0.1 if "DC" in f else 0.5
-            val = base + random.gauss(0, base * 0.005)
-        elif "Widerstand" in f:
-            val = 1000.0 + random.gauss(0, 0.5)
-        elif "Frequenz" in f:
-            val = 50.0 + random.gauss(0, 0.01)
-        elif "Periode" in f:
-            val = 0.02 + random.gauss(0, 1e-6)
+        base, sigma, rectify = self._sim_params_cached
+        v = base + sigma * self._noise[i]
+        return abs(v) if rectify else v
+
+    def _simulate_batch(self, n: int) -> np.ndarray:
+        """n simulierte Messwerte auf einmal (normalverteiltes Rauschen)."""
+        self._sim_phase += 0.1 * n
+        base, sigma, rectify = self._sim_params_cached
+        arr = self._rng.normal(base, sigma, n)
+        if rectify:
+            np.abs(arr, out=arr)
+        return arr
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Dateiausgabe
+# ─────────────────────────────────────────────────────────────────────────────
+
+EXPORT_TITLE = "HP/Agilent 34401A – Messung"
+# Ab so vielen Werten statt eines nativen Excel-Diagramms (das Excel bei
+# jedem Öffnen aus allen Zellen neu zeichnet) ein fertiges Bild einbetten
+CHART_MAX_ROWS = 10_000
+
+
+def _col_width(texts) -> int:
+    return min(max(map(len, texts), default=0) + 4, 40)
+
+
+def _stat_rows(mean: float, std: float, mn: float, mx: float,
+               unit: str) -> list:
+    return [
+        ("Mittelwert (μ):", f"{mean:.9g} {unit}"),
+        ("Std.-Abw. (σ):", f"{std:.6g} {unit}"),
+        ("Minimum:",       f"{mn:.9g} {unit}"),
+        ("Maximum:",       f"{mx:.9g} {unit}"),
+        ("Peak-Peak:",     f"{mx - mn:.6g} {unit}"),
+    ]
+
+
+def _clock_strings(abs_t0: np.datetime64, timestamps: np.ndarray) -> list:
+    """Uhrzeiten HH:MM:SS.mmm zu relativen Zeitstempeln (s), in C formatiert."""
+    abs_times = abs_t0 + np.round(timestamps * 1e6).astype("timedelta64[us]")
+    # "YYYY-MM-DDTHH:MM:SS.mmm" → Uhrzeit
+    return [ts[11:] for ts in
+            np.datetime_as_string(abs_times, unit="ms").tolist()]
+
+
+def _chart_png(rel_t, vals, func: str, unit: str) -> io.BytesIO:
+    """Messverlauf als PNG für große Exporte."""
+    # Eigene Figure ohne pyplot, darf daher im Hintergrund-Thread entstehen
+    fig = Figure(figsize=(10, 5.5), dpi=120)
+    ax = fig.add_subplot()
+    ax.plot(rel_t, vals, linewidth=0.8)
+    ax.set_title(f"{func} – Messverlauf")
+    ax.set_xlabel("Zeit (s)")
+    ax.set_ylabel(f"Messwert ({unit})")
+    ax.grid(True, alpha=0.4)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    buf.seek(0)
+    return buf
+
+
+def _styled_cell(sheet, value=None, font=None, fill=None, alignment=None,
+                 style=None):
+    cell = _openpyxl().WriteOnlyCell(sheet, value=value)
+    if style:
+        cell.style = style
+    if font:
+        cell.font = font
+    if fill:
+        cell.fill = fill
+    if alignment:
+        cell.alignment = alignment
+    return cell
+
+
+class XlsxStreamWriter:
+    """Messdaten-Tabelle über openpyxl im Streaming-Modus (write_only).
+
+    Zeilen werden beim Anhängen sofort serialisiert, es entsteht kein
+    Zellgraph im Speicher. Das Diagramm wird beim Schließen ergänzt und
+    verweist direkt auf die Datenspalten; werden dazu die Werte übergeben
+    und sind es mehr als CHART_MAX_ROWS, wird stattdessen ein Bild
+    eingebettet. `target` ist ein Pfad oder ein Dateiobjekt.
+    """
+
+    def __init__(self, target, meta: list, cols: list, widths: list):
+        xl = _openpyxl()
+        self._target = target
+        wb = self._wb = xl.Workbook(write_only=True)
+        ws = self._ws = wb.create_sheet("Messdaten")
+        # Im Streaming-Modus vor der ersten Zeile
+        for letter, w in zip("ABCD", widths):
+            ws.column_dimensions[letter].width = w
+
+        # ── Kopf ────────────────────────────────────────────────────────────
+        ws.merged_cells.add("A1:E1")
+        ws.append([_styled_cell(ws, EXPORT_TITLE, font=xl.TITLE_FONT)])
+        for k, v in meta:
+            ws.append([_styled_cell(ws, k, font=xl.META_FONT), str(v)])
+        ws.append([])
+
+        # ── Spaltentitel ────────────────────────────────────────────────────
+        ws.append([_styled_cell(ws, txt, font=xl.HEADER_FONT,
+                                fill=xl.HEADER_FILL, alignment=xl.CENTER)
+                   for txt in cols])
+        self._header_row = len(meta) + 3
+        self.rows = 0
+
+        # Zeilenformate als benannte Stile einmal im Workbook registrieren,
+        # die Zellen verweisen dann nur noch per Name darauf
+        odd_style = xl.NamedStyle(name="odd_row", border=xl.BORDER)
+        even_style = xl.NamedStyle(name="even_row", border=xl.BORDER,
+                                   fill=xl.EVEN_FILL)
+        wb.add_named_style(odd_style)
+        wb.add_named_style(even_style)
+        # Formatierte Zellen je Zeilenart einmal anlegen und nur die Werte
+        # tauschen; append serialisiert sofort, die Wiederverwendung ist sicher
+        self._row_cells = (
+            [_styled_cell(ws, style=odd_style.name) for _ in cols],
+            [_styled_cell(ws, style=even_style.name) for _ in cols])
+
+    def append_rows(self, first: int, rel_t, vals_r, time_strs):
+        ws, row_cells = self._ws, self._row_cells
+        n = 0
+        for i, (r, val, ts_str) in enumerate(
+                zip(rel_t, vals_r, time_strs), start=first):
+            cells = row_cells[i % 2 == 0]
+            # Fehlmessung (NaN) als leere Zelle, wie im xlsxwriter-Pfad
+            for cell, v in zip(cells, (i, r, val if val == val else None,
+                                       ts_str)):
+                cell.value = v
+            ws.append(cells)
+            n += 1
+        self.rows += n
+
+    def close(self, stats: list, func: str, unit: str, points: tuple = None):
+        ws, xl = self._ws, _openpyxl()
+        # ── Statistik ────────────────────────────────────────────────────────
+        ws.append([])
+        ws.append([_styled_cell(ws, "Statistik", font=xl.STAT_TITLE_FONT)])
+        # Wie bei den Zeilen: Stil einmal registrieren, eine Zelle wiederverwenden
+        key_style = xl.NamedStyle(name="stat_key", font=xl.BOLD_FONT)
+        self._wb.add_named_style(key_style)
+        key_cell = _styled_cell(ws, style=key_style.name)
+        for k, v in stats:
+            key_cell.value = k
+            ws.append([key_cell, v])
+
+        # ── Liniendiagramm ───────────────────────────────────────────────────
+        if points is not None and self.rows > CHART_MAX_ROWS:
+            img_ws = self._wb.create_sheet("Diagramm")
+            img_ws.add_image(xl.Image(_chart_png(*points, func, unit)), "A1")
+            self._wb.save(self._target)
+            return
+        header_row = self._header_row
+        last = header_row + self.rows
+        chart = xl.LineChart()
+        chart.title = f"{func} – Messverlauf"
+        chart.style = 10
+        chart.y_axis.title = f"Messwert ({unit})"
+        chart.x_axis.title = "Zeit (s)"
+        # Reihentitel direkt setzen statt aus der Kopfzelle ableiten lassen
+        chart.series.append(xl.Series(xl.Reference(ws, min_col=3,
+                                                   min_row=header_row + 1,
+                                                   max_row=last),
+                                      title=f"Messwert ({unit})"))
+        chart.set_categories(xl.Reference(ws, min_col=2,
+                                          min_row=header_row + 1,
+                                          max_row=last))
+        self._wb.create_chartsheet("Diagramm").add_chart(chart)
+
+        self._wb.save(self._target)
+
+
+class FastXlsxStreamWriter:
+    """Wie XlsxStreamWriter, aber über xlsxwriter (constant_memory): jede
+    Zeile geht beim Beginn der nächsten in die Arbeitsdatei, deutlich
+    schneller als openpyxl."""
+
+    def __init__(self, target, meta: list, cols: list, widths: list):
+        import xlsxwriter
+        wb = self._wb = xlsxwriter.Workbook(target, {"constant_memory": True,
+                                                     "nan_inf_to_errors": True})
+        ws = self._ws = wb.add_worksheet("Messdaten")
+        self._stat_title_fmt = wb.add_format({"bold": True,
+                                              "font_color": "#A6E3A1",
+                                              "font_size": 11})
+        self._bold_fmt = wb.add_format({"bold": True})
+        border = {"border": 1, "border_color": "#45475A"}
+        self._row_fmts = (wb.add_format(border),
+                          wb.add_format({**border, "bg_color": "#1E1E2E"}))
+
+        for col, w in enumerate(widths):
+            ws.set_column(col, col, w)
+
+        # ── Kopf ────────────────────────────────────────────────────────────
+        ws.merge_range(0, 0, 0, 4, EXPORT_TITLE, wb.add_format(
+            {"font_name": "Calibri", "bold": True, "font_color": "#89B4FA",
+             "font_size": 14}))
+        meta_fmt = wb.add_format({"bold": True, "font_color": "#74C7EC"})
+        for row, (k, v) in enumerate(meta, start=1):
+            ws.write_string(row, 0, k, meta_fmt)
+            ws.write_string(row, 1, str(v))
+
+        # ── Spaltentitel ────────────────────────────────────────────────────
+        self._header_row = len(meta) + 2        # 0-basiert
+        ws.write_row(self._header_row, 0, cols, wb.add_format(
+            {"font_name": "Calibri", "bold": True, "font_color": "#FFFFFF",
+             "font_size": 11, "bg_color": "#1E3A5F", "align": "center"}))
+        self.rows = 0
+
+    def append_rows(self, first: int, rel_t, vals_r, time_strs):
+        ws, row_fmts = self._ws, self._row_fmts
+        row = self._header_row + self.rows
+        n = 0
+        for i, (r, val, ts_str) in enumerate(
+                zip(rel_t, vals_r, time_strs), start=first):
+            n += 1
+            # Fehlmessung (NaN): None schreibt eine formatierte leere Zelle
+            # wie openpyxl statt #NUM!
+            ws.write_row(row + n, 0, (i, r, val if val == val else None, ts_str),
+                         row_fmts[i % 2 == 0])
+        self.rows += n
+
+    def close(self, stats: list, func: str, unit: str, points: tuple = None):
+        wb, ws = self._wb, self._ws
+        # ── Statistik ────────────────────────────────────────────────────────
+        header_row = self._header_row
+        stat_row = header_row + self.rows + 2
+        ws.write_string(stat_row, 0, "Statistik", self._stat_title_fmt)
+        for j, (k, v) in enumerate(stats, start=1):
+            ws.write_string(stat_row + j, 0, k, self._bold_fmt)
+            ws.write_string(stat_row + j, 1, v)
+
+        # ── Liniendiagramm ───────────────────────────────────────────────────
+        if points is not None and self.rows > CHART_MAX_ROWS:
+            wb.add_worksheet("Diagramm").insert_image(
+                0, 0, "diagramm.png",
+                {"image_data": _chart_png(*points, func, unit)})
+            wb.close()
+            return
+        # Reihe verweist direkt auf die Datenspalten, keine Kopie der Werte
+        first, last = header_row + 1, header_row + self.rows
+        chart = wb.add_chart({"type": "line"})
+        chart.add_series({"name": ["Messdaten", header_row, 2],
+                          "categories": ["Messdaten", first, 1, last, 1],
+                          "values": ["Messdaten", first, 2, last, 2]})
+        chart.set_title({"name": f"{func} – Messverlauf"})
+        chart.set_y_axis({"name": f"Messwert ({unit})"})
+        chart.set_x_axis({"name": "Zeit (s)"})
+        chart.set_style(10)
+        wb.add_chartsheet("Diagramm").set_chart(chart)
+
+        wb.close()
+
+
+def _xlsx_stream_writer(target, meta: list, cols: list, widths: list):
+    # xlsxwriter ist beim Schreiben deutlich schneller, openpyxl
+    # bleibt als Rückfall
+    cls = FastXlsxStreamWriter if XLSXWRITER_AVAILABLE else XlsxStreamWriter
+    return cls(target, meta, cols, widths)
+
+
+class LiveLogger:
+    """Schreibt Messwerte schon während der Messung fort (CSV oder xlsx).
+
+    Die Datei wird beim Start angelegt, `append` hängt jeden aus der Queue
+    entnommenen Block mit einem einzigen Schreibaufruf an (CSV wird höchstens
+    alle FLUSH_S Sekunden auf die Platte gebracht), `close` ergänzt Anzahl
+    und Statistik. Mittelwert und σ über alle geschriebenen Werte führt
+    Welfords Verfahren mit.
+    """
+
+    FLUSH_S = 0.25
+
+    def __init__(self, path: str, fmt: str, meta: list, func: str,
+                 wall_t0: datetime.datetime, t0: float = 0.0):
+        self.path, self.func = path, func
+        # Zeitstempel der Messung, der hier als 0 s gilt (zu wall_t0)
+        self._t0 = t0
+        self.unit = unit = Multimeter34401A.UNITS.get(func, "")
+        self.n = 0
+        self._abs_t0 = np.datetime64(wall_t0, "us")
+        self._nfin = 0
+        self._mean = self._m2 = 0.0
+        self._min, self._max = math.inf, -math.inf
+        if fmt == "csv":
+            self._xlsx = None
+            # Binär: ohne Textschicht und Zeilenende-Umsetzung, "\n" wie im
+            # Export über np.savetxt
+            self._file = open(path, "wb", buffering=1 << 16)
+            self._last_flush = time.perf_counter()
+            self._file.write("".join(
+                f"# {line}\n" for line in [EXPORT_TITLE]
+                + [f"{k} {v}" for k, v in meta]
+                + [f"#;Zeit (s);Messwert ({unit})"]).encode("utf-8"))
         else:
-            val = random.gauss(0, 0.001)
-        return val
+            self._file = None
+            cols = ["#", "Zeit (s)", f"Messwert ({unit})", "Datum / Zeit"]
+            # Länge der Messung unbekannt → Datenspalten großzügig schätzen
+            keys = [k for k, _ in meta + _stat_rows(0, 0, 0, 0, unit)]
+            widths = [
+                _col_width([EXPORT_TITLE, "Statistik", "Anzahl Punkte:"] + keys),
+                _col_width([str(v) for _, v in meta]
+                           + [cols[1], f"-1.23456789e-05 {unit}"]),
+                _col_width([cols[2], "-1.23456789e-05"]),
+                _col_width([cols[3], "HH:MM:SS.mmm"]),
+            ]
+            self._xlsx = _xlsx_stream_writer(path, meta, cols, widths)
+
+    def append(self, items: list):
+        if not items:
+            return
+        n = len(items)
+        ts = np.fromiter((t for t, _ in items), np.float64, n) - self._t0
+        vals = np.fromiter((v for _, v in items), np.float64, n)
+        for x in vals.tolist():
+            if x != x:
+                continue        # fehlgeschlagene Messung
+            self._nfin += 1
+            d = x - self._mean
+            self._mean += d / self._nfin
+            self._m2 += d * (x - self._mean)
+            if x < self._min:
+                self._min = x
+            if x > self._max:
+                self._max = x
+        first = self.n + 1
+        if self._file:
+            self._file.write("".join(
+                f"{i};{t:.4f};{v:.9g}\n" for i, t, v in
+                zip(range(first, first + n), ts.tolist(),
+                    vals.tolist())).encode("ascii"))
+            now = time.perf_counter()
+            if now - self._last_flush >= self.FLUSH_S:
+                self._file.flush()
+                self._last_flush = now
+        else:
+            self._xlsx.append_rows(first, np.round(ts, 4).tolist(),
+                                   np.round(vals, 9).tolist(),
+                                   _clock_strings(self._abs_t0, ts))
+        self.n += n
+
+    def close(self):
+        if self._nfin:
+            mean, std = self._mean, math.sqrt(self._m2 / self._nfin)
+            mn, mx = self._min, self._max
+        else:
+            mean = std = mn = mx = math.nan
+        stats = ([("Anzahl Punkte:", str(self.n))]
+                 + _stat_rows(mean, std, mn, mx, self.unit))
+        if self._file:
+            self._file.write("".join(
+                f"# {k} {v}\n" for k, v in stats).encode("utf-8"))
+            # Einmal am Ende auf die Platte zwingen statt je Block
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        else:
+            self._xlsx.close(stats, self.func, self.unit)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -208,6 +670,15 @@ class Multimeter34401A:
 
 class MultimeterApp(tk.Tk):
 
+    BLOCK_MS = 250      # Intervalle darunter werden blockweise gemessen
+    BUF_MIN = 1024      # anfängliche Größe der Messwertpuffer
+    SEGMENT_ROWS = 250_000  # größere Excel-Exporte auf mehrere Dateien verteilen
+    EXPORT_FORMATS = {
+        "xlsx":    ("Excel", "Excel-Dateien"),
+        "csv":     ("CSV", "CSV-Dateien"),
+        "parquet": ("Parquet", "Parquet-Dateien"),
+    }
+
     PLOT_COLORS = {
         "Hintergrund": "#1e1e2e", "Achsen": "#313244",
         "Linie": "#89b4fa", "Gitter": "#45475a",
@@ -222,15 +693,42 @@ class MultimeterApp(tk.Tk):
         self.resizable(True, True)
 
         self.dmm = Multimeter34401A()
-        self.data_timestamps: list[float] = []
-        self.data_values: list[float] = []
+        # Dauerhafte Hintergrund-Threads statt eines neuen Threads je Aufgabe;
+        # zwei, damit Suchen/Verbinden nicht hinter einem Export warten
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="dmm-bg")
+        # Messdaten als Ringpuffer: _head = nächste Schreibposition. Der
+        # Speicher wächst durch Verdoppeln bis zur Kapazität _cap mit
+        self._cap = 1000
+        size = min(self._cap, self.BUF_MIN)
+        self._ts_buf = np.empty(size, dtype=np.float64)
+        self._val_buf = np.empty(size, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        # Zielpuffer für die geordnete Kopie an line.set_data; erst nötig,
+        # wenn der Ringpuffer voll ist und umläuft
+        self._alloc_plot_buffers(size == self._cap)
         self.running = False
         self.measure_thread = None
-        self.data_queue = queue.Queue()
+        # Je Messung ein eigenes Event: Stop weckt den Mess-Thread aus dem
+        # Warten auf den nächsten Rasterpunkt
+        self._stop_evt = threading.Event()
+        # deque statt Queue: append/popleft sind ohne Python-Lock atomar
+        # (ein Erzeuger, ein Verbraucher); abgeholt wird im Animationstakt
+        self.data_queue = collections.deque()
+        self._ymin = math.inf       # laufendes Min/Max der gepufferten Werte
+        self._ymax = -math.inf
+        self._mean = self._m2 = 0.0     # Welford-Akkumulatoren für μ/σ
+        self._nfin = 0              # Anzahl gültiger (nicht-NaN) Werte
+        self._evicted = 0           # überschriebene Werte seit letztem Abgleich
+        self._last_disp_str = ""    # zuletzt angezeigter Messwert
+        self._stat_txt = ""         # zuletzt gesetzter Statistiktext
+        self._last_disp_t = 0.0
+        self._live = None           # LiveLogger der laufenden Aufzeichnung
 
         self._build_style()
         self._build_layout()
-        self._update_plot_loop()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     # ── Stil ────────────────────────────────────────────────────────────────
 
@@ -262,6 +760,8 @@ class MultimeterApp(tk.Tk):
                         insertcolor=fg)
         style.configure("TCheckbutton", background=bg, foreground=fg,
                         font=("Segoe UI", 9))
+        style.configure("TRadiobutton", background=bg, foreground=fg,
+                        font=("Segoe UI", 9))
 
     # ── Layout ──────────────────────────────────────────────────────────────
 
@@ -285,6 +785,9 @@ class MultimeterApp(tk.Tk):
         self._build_display(right)
         self._build_plot(right)
 
+        # Erst jetzt existieren Display und Achsen
+        self._on_function_change()
+
     # ── Verbindungsrahmen ───────────────────────────────────────────────────
 
     def _build_connection_frame(self, parent):
@@ -300,8 +803,9 @@ class MultimeterApp(tk.Tk):
                                            width=22, state="normal")
         self.resource_combo.pack(side=tk.LEFT, padx=(6, 4))
 
-        ttk.Button(row1, text="🔍", width=3,
-                   command=self._scan_resources).pack(side=tk.LEFT)
+        self.btn_scan = ttk.Button(row1, text="🔍", width=3,
+                                   command=self._scan_resources)
+        self.btn_scan.pack(side=tk.LEFT)
 
         row2 = ttk.Frame(frm)
         row2.pack(fill=tk.X, pady=(6, 0))
@@ -341,7 +845,6 @@ class MultimeterApp(tk.Tk):
         res_cb.grid(row=2, column=1, padx=(6, 0), pady=2, sticky=tk.EW)
 
         frm.columnconfigure(1, weight=1)
-        self._on_function_change()
 
     # ── Aufnahmerahmen ──────────────────────────────────────────────────────
 
@@ -352,20 +855,31 @@ class MultimeterApp(tk.Tk):
         ttk.Label(frm, text="Intervall (ms):").grid(row=0, column=0,
                                                       sticky=tk.W, pady=2)
         self.interval_var = tk.StringVar(value="500")
+        self._interval_cached = 500     # Intervall der laufenden Messung
         ttk.Entry(frm, textvariable=self.interval_var, width=10).grid(
             row=0, column=1, padx=(6, 0), pady=2, sticky=tk.EW)
 
         ttk.Label(frm, text="Max. Punkte:").grid(row=1, column=0,
                                                    sticky=tk.W, pady=2)
         self.maxpts_var = tk.StringVar(value="1000")
+        self._maxpts_cached = 1000
+        self.maxpts_var.trace_add("write", self._on_maxpts_change)
         ttk.Entry(frm, textvariable=self.maxpts_var, width=10).grid(
             row=1, column=1, padx=(6, 0), pady=2, sticky=tk.EW)
 
         self.autoscale_var = tk.BooleanVar(value=True)
+        self._autoscale_cached = True
+        self.autoscale_var.trace_add(
+            "write", lambda *_: setattr(self, "_autoscale_cached",
+                                        self.autoscale_var.get()))
         ttk.Checkbutton(frm, text="Autoskalierung", variable=self.autoscale_var).grid(
             row=2, column=0, columnspan=2, sticky=tk.W, pady=2)
 
         self.statistics_var = tk.BooleanVar(value=True)
+        self._statistics_cached = True
+        self.statistics_var.trace_add(
+            "write", lambda *_: setattr(self, "_statistics_cached",
+                                        self.statistics_var.get()))
         ttk.Checkbutton(frm, text="Statistik anzeigen",
                         variable=self.statistics_var).grid(
             row=3, column=0, columnspan=2, sticky=tk.W, pady=2)
@@ -378,7 +892,17 @@ class MultimeterApp(tk.Tk):
         frm = ttk.LabelFrame(parent, text=" 💾 Datei ", padding=8)
         frm.pack(fill=tk.X, pady=(0, 6))
 
-        ttk.Label(frm, text="Dateiname (.xlsx):").pack(anchor=tk.W)
+        # Dateiformat; CSV/Parquet sind für große Messreihen viel schneller
+        fmt_row = ttk.Frame(frm)
+        fmt_row.pack(fill=tk.X, pady=(0, 4))
+        self.format_var = tk.StringVar(value="xlsx")
+        for ext, (label, _) in self.EXPORT_FORMATS.items():
+            ttk.Radiobutton(fmt_row, text=label, value=ext,
+                            variable=self.format_var,
+                            command=self._on_format_change).pack(side=tk.LEFT,
+                                                                 padx=(0, 8))
+
+        ttk.Label(frm, text="Dateiname:").pack(anchor=tk.W)
 
         row = ttk.Frame(frm)
         row.pack(fill=tk.X, pady=(4, 0))
@@ -389,7 +913,12 @@ class MultimeterApp(tk.Tk):
         ttk.Button(row, text="📁", width=3,
                    command=self._browse_file).pack(side=tk.LEFT, padx=(4, 0))
 
-        self.btn_save = ttk.Button(frm, text="💾 In Excel speichern",
+        # Live-Aufzeichnung: Zeilen schon während der Messung schreiben
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frm, text="Während der Messung mitschreiben",
+                        variable=self.live_var).pack(anchor=tk.W, pady=(6, 0))
+
+        self.btn_save = ttk.Button(frm, text="💾 Speichern",
                                    command=self._save_excel, state="disabled")
         self.btn_save.pack(fill=tk.X, pady=(6, 0))
 
@@ -433,7 +962,6 @@ class MultimeterApp(tk.Tk):
         inner = tk.Frame(disp_frame, bg="#11111b", relief="sunken", bd=2)
         inner.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
 
-        self.display_value = tk.StringVar(value="- - - - - -")
         self.display_unit = tk.StringVar(value="V")
         self.display_func = tk.StringVar(value="DC Spannung")
 
@@ -444,9 +972,11 @@ class MultimeterApp(tk.Tk):
         val_row = tk.Frame(inner, bg="#11111b")
         val_row.pack(fill=tk.X, expand=True)
 
-        tk.Label(val_row, textvariable=self.display_value,
-                 bg="#11111b", fg="#a6e3a1",
-                 font=("Courier New", 36, "bold")).pack(side=tk.LEFT, padx=12)
+        # Messwert ohne StringVar: Text wird direkt und nur bei Änderung gesetzt
+        self.display_value_lbl = tk.Label(val_row, text="- - - - - -",
+                                          bg="#11111b", fg="#a6e3a1",
+                                          font=("Courier New", 36, "bold"))
+        self.display_value_lbl.pack(side=tk.LEFT, padx=12)
         tk.Label(val_row, textvariable=self.display_unit,
                  bg="#11111b", fg="#89b4fa",
                  font=("Courier New", 22)).pack(side=tk.LEFT, pady=(8, 0))
@@ -466,12 +996,11 @@ class MultimeterApp(tk.Tk):
         self.ax = self.fig.add_subplot(111)
         self._style_axes()
         self.line, = self.ax.plot([], [], color=c["Linie"], linewidth=1.5,
-                                  antialiased=True)
+                                  antialiased=True, animated=True)
         self.fig.tight_layout(pad=1.2)
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=plot_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
         toolbar_frame = ttk.Frame(plot_frame)
         toolbar_frame.pack(fill=tk.X)
         self.toolbar = NavigationToolbar2Tk(self.canvas, toolbar_frame)
@@ -483,20 +1012,40 @@ class MultimeterApp(tk.Tk):
             verticalalignment="top", fontfamily="monospace", fontsize=8,
             color=self.PLOT_COLORS["Akzent"],
             bbox=dict(boxstyle="round,pad=0.3", facecolor="#181825",
-                      edgecolor="#45475a", alpha=0.8))
+                      edgecolor="#45475a", alpha=0.8),
+            animated=True)
+
+        # Eigener Timer: der Takt wird über dessen öffentliches `interval`
+        # angepasst, ohne dass _animate_frame self._anim braucht
+        self._anim_timer = self.canvas.new_timer(interval=500)
+        self._frame_delay = 500
+        self._delay_hooked = False
+        self._anim_paused = False
+        # Blitting übernimmt FuncAnimation; Hintergrund je Achsenansicht
+        # wird dort zwischengespeichert und bei Resize neu aufgebaut
+        self._anim = animation.FuncAnimation(
+            self.fig, self._animate_frame, init_func=self._animated_artists,
+            interval=500, blit=True, cache_frame_data=False,
+            event_source=self._anim_timer)
 
     def _style_axes(self):
         c = self.PLOT_COLORS
-        self.ax.set_facecolor(c["Achsen"])
-        self.ax.tick_params(colors=c["Text"], labelsize=8)
-        self.ax.xaxis.label.set_color(c["Text"])
-        self.ax.yaxis.label.set_color(c["Text"])
-        for spine in self.ax.spines.values():
-            spine.set_edgecolor(c["Gitter"])
-        self.ax.grid(True, color=c["Gitter"], linewidth=0.5, alpha=0.6)
-        self.ax.set_xlabel("Zeit (s)", color=c["Text"], fontsize=9)
-        self.ax.set_ylabel("Messwert", color=c["Text"], fontsize=9)
-        self.ax.set_title("Messverlauf", color=c["Text"], fontsize=10)
+        ax, text, grid = self.ax, c["Text"], c["Gitter"]
+        ax.set_facecolor(c["Achsen"])
+        ax.tick_params(colors=text, labelsize=8)
+        ax.xaxis.label.set_color(text)
+        ax.yaxis.label.set_color(text)
+        for spine in ax.spines.values():
+            spine.set_edgecolor(grid)
+        ax.grid(True, color=grid, linewidth=0.5, alpha=0.6)
+        ax.set_xlabel("Zeit (s)", color=text, fontsize=9)
+        ax.set_ylabel("Messwert", color=text, fontsize=9)
+        ax.set_title("Messverlauf", color=text, fontsize=10)
+
+    # ── Animation ───────────────────────────────────────────────────────────
+
+    def _animated_artists(self):
+        return self.line, self.stat_text
 
     # ── Callbacks ───────────────────────────────────────────────────────────
 
@@ -506,14 +1055,53 @@ class MultimeterApp(tk.Tk):
         self.range_cb["values"] = ranges
         self.range_var.set(ranges[0])
         unit = Multimeter34401A.UNITS.get(func, "")
+        self._func_cached, self._unit_cached = func, unit
         self.display_unit.set(unit)
         self.display_func.set(func)
         self.ax.set_ylabel(f"Messwert ({unit})", color=self.PLOT_COLORS["Text"],
                            fontsize=9)
-        self.canvas.draw_idle()
+        # Die Achsenbeschriftung liegt außerhalb des Blit-Bereichs und braucht
+        # einen vollen Neuaufbau; vor dem ersten Anzeigen zeichnet Tk die
+        # Figur ohnehin komplett
+        if self.winfo_viewable():
+            self.canvas.draw_idle()
+
+    def _on_maxpts_change(self, *_):
+        # Ungültige Zwischenstände beim Tippen ignorieren
+        try:
+            maxpts = int(self.maxpts_var.get())
+        except ValueError:
+            return
+        if maxpts >= 1:
+            self._maxpts_cached = maxpts
+            # Puffergröße wird im nächsten Animationsschritt angepasst
+            self._resume_animation()
+
+    # ── Hintergrundaufgaben ─────────────────────────────────────────────────
+
+    def _run_background(self, work, done):
+        """`work()` im Hintergrund-Pool ausführen (VISA, Dateien) und
+        danach `done(ergebnis, fehler)` im Tk-Thread aufrufen."""
+        future = self._pool.submit(work)
+        self.after(50, self._poll_background, future, done)
+
+    def _poll_background(self, future: concurrent.futures.Future, done):
+        # Tk nur aus dem Haupt-Thread bedienen, daher hier nachfragen
+        if not future.done():
+            self.after(50, self._poll_background, future, done)
+            return
+        error = future.exception()
+        done(None if error else future.result(), error)
 
     def _scan_resources(self):
-        resources = self.dmm.list_resources()
+        # Die VISA-Suche kann Sekunden dauern → nicht im Tk-Thread
+        self.btn_scan.configure(state="disabled")
+        self.status_var.set("Suche Geräte …")
+        self._run_background(self.dmm.list_resources, self._scan_done)
+
+    def _scan_done(self, resources: list, error: Exception):
+        self.btn_scan.configure(state="normal")
+        resources = resources or []
         vals = ["SIMULATION"] + resources
         self.resource_combo["values"] = vals
         self.status_var.set(
@@ -534,16 +1122,26 @@ class MultimeterApp(tk.Tk):
                 self.sim_indicator.configure(text="SIM")
                 self.status_var.set("Simulationsmodus aktiv")
             else:
-                try:
-                    self.dmm.connect(res)
-                    self.conn_status.configure(text="● Verbunden",
-                                               foreground="#a6e3a1")
-                    self.btn_connect.configure(text="Trennen", style="Stop.TButton")
-                    self.sim_indicator.configure(text="")
-                    self.status_var.set(f"Verbunden: {res}")
-                except Exception as e:
-                    messagebox.showerror("Verbindungsfehler", str(e))
-                    self.status_var.set(f"Fehler: {e}")
+                # Öffnen, *IDN? und *RST blockieren → im Hintergrund; solange
+                # keine zweite Verbindung und keine Messung starten
+                self.btn_connect.configure(state="disabled")
+                self.btn_start.configure(state="disabled")
+                self.status_var.set(f"Verbinde mit {res} …")
+                self._run_background(lambda: self.dmm.connect(res),
+                                     lambda _, err: self._connect_done(res, err))
+
+    def _connect_done(self, res: str, error: Exception):
+        self.btn_connect.configure(state="normal")
+        if not self.running:
+            self.btn_start.configure(state="normal")
+        if error is not None:
+            messagebox.showerror("Verbindungsfehler", str(error))
+            self.status_var.set(f"Fehler: {error}")
+            return
+        self.conn_status.configure(text="● Verbunden", foreground="#a6e3a1")
+        self.btn_connect.configure(text="Trennen", style="Stop.TButton")
+        self.sim_indicator.configure(text="")
+        self.status_var.set(f"Verbunden: {res}")
 
     def _start_measurement(self):
         try:
@@ -554,98 +1152,464 @@ class MultimeterApp(tk.Tk):
             messagebox.showerror("Eingabefehler", str(e))
             return
 
+        if self.measure_thread is not None and self.measure_thread.is_alive():
+            # Der alte Mess-Thread schläft noch bis zum nächsten Rasterpunkt
+            self.status_var.set("Vorherige Messung wird noch beendet …")
+            return
+
+        self._interval_cached = interval_ms
+
+        # Restliche Werte der vorherigen Messung übernehmen
+        items = self._drain()
+        self._append_samples(items)
+        if self._live is not None:
+            # Vorherige Live-Aufzeichnung zuerst abschließen
+            self._live_write(items, finish=True)
+        # Zeitachse fortsetzen statt wieder bei 0 zu beginnen, damit die
+        # gepufferten Zeitstempel aufsteigend bleiben
+        dt = interval_ms / 1000.0
+        t_start = float(self._ts_buf[self._head - 1]) + dt if self._count else 0.0
+        live = self.live_var.get()
+        if live and not self._live_settings_ok():
+            return
+
         # Gerät konfigurieren
-        self.dmm.configure(self.func_var.get(),
-                           self.range_var.get(),
-                           self.res_var.get())
+        try:
+            self.dmm.configure(self.func_var.get(),
+                               self.range_var.get(),
+                               self.res_var.get())
+        except Exception as e:
+            messagebox.showerror("Gerätefehler", str(e))
+            return
 
         self.running = True
+        self._stop_evt = threading.Event()
+        self._resume_animation()
         self.btn_start.configure(state="disabled")
         self.btn_stop.configure(state="normal")
         self.btn_save.configure(state="disabled")
         self.status_var.set("Messung läuft …")
+        # Während der Messung ohne Kantenglättung zeichnen (schneller)
+        self.line.set_antialiased(False)
 
         self.measure_thread = threading.Thread(
-            target=self._measure_loop, args=(interval_ms,), daemon=True)
+            target=self._measure_loop,
+            args=(interval_ms, t_start, self._stop_evt), daemon=True)
         self.measure_thread.start()
+        # Erst jetzt anlegen: die ersten Werte liegen bis zum nächsten
+        # Animationsschritt in der Queue; schlägt das Anlegen fehl, wird
+        # die Messung wieder gestoppt
+        if live and not self._open_live_logger(t_start):
+            self._stop_measurement()
+
+    def _live_settings_ok(self) -> bool:
+        fmt, path = self.format_var.get(), self.filename_var.get()
+        if fmt == "parquet":
+            messagebox.showerror("Live-Aufzeichnung",
+                                 "Live-Aufzeichnung ist nur als Excel oder CSV möglich.")
+            return False
+        if fmt == "xlsx" and not (XLSXWRITER_AVAILABLE or OPENPYXL_AVAILABLE):
+            messagebox.showerror("Fehler", "Modul 'openpyxl' nicht installiert.\n"
+                                           "Bitte: pip install openpyxl")
+            return False
+        if not path:
+            messagebox.showwarning("Dateiname fehlt", "Bitte einen Dateinamen eingeben.")
+            return False
+        return True
+
+    def _open_live_logger(self, t0: float) -> bool:
+        fmt, path = self.format_var.get(), self.filename_var.get()
+        now = datetime.datetime.now()
+        try:
+            self._live = LiveLogger(self._live_path(path, fmt, now), fmt,
+                                    self._export_meta(now),
+                                    self.func_var.get(), now, t0)
+        except Exception as e:
+            messagebox.showerror("Speicherfehler", str(e))
+            return False
+        return True
+
+    @staticmethod
+    def _live_path(path: str, fmt: str, now: datetime.datetime) -> str:
+        """Eigener Dateiname je Live-Aufzeichnung (`<name>_live_<Zeit>`):
+        weder der Export über „Speichern“ noch ein weiterer Start
+        überschreiben eine fertige Aufzeichnung."""
+        base = f"{os.path.splitext(path)[0]}_live_{now:%Y%m%d_%H%M%S}"
+        live_path, k = f"{base}.{fmt}", 1
+        while os.path.exists(live_path):
+            k += 1
+            live_path = f"{base}_{k}.{fmt}"
+        return live_path
+
+    def _live_write(self, items: list, finish: bool):
+        """Entnommene Werte an die Live-Datei anhängen; mit `finish` die Datei
+        abschließen (Statistik, Diagramm, Speichern)."""
+        live = self._live
+        try:
+            live.append(items)
+            if finish:
+                self._live = None
+                # Statistik anhängen und (bei xlsx) die Datei erst schreiben,
+                # kann bei langen Aufzeichnungen dauern → im Hintergrund
+                self.status_var.set(f"Schließe Live-Datei {live.path} …")
+                self._run_background(live.close,
+                                     lambda _, err: self._live_closed(live, err))
+        except Exception as e:
+            self._live = None
+            messagebox.showerror("Speicherfehler", str(e))
+
+    def _live_closed(self, live: LiveLogger, error: Exception):
+        if error:
+            messagebox.showerror("Speicherfehler", str(error))
+            return
+        self.status_var.set(
+            f"Live-Datei gespeichert: {live.path} ({live.n} Punkte)")
+
+    def _on_close(self):
+        """Fenster schließen: Messung beenden und eine laufende
+        Live-Aufzeichnung noch abschließen (der Pool schreibt sie nach dem
+        Ende der Hauptschleife fertig)."""
+        self.running = False
+        self._stop_evt.set()
+        if self.measure_thread is not None:
+            # Der Mess-Thread beendet höchstens noch den laufenden Block
+            self.measure_thread.join(timeout=2)
+        if self._live is not None:
+            self._live_write(self._drain(), finish=True)
+        self.destroy()
 
     def _stop_measurement(self):
         self.running = False
+        self._stop_evt.set()
+        self.line.set_antialiased(True)
         self.btn_start.configure(state="normal")
         self.btn_stop.configure(state="disabled")
-        if self.data_values:
+        if self._count:
             self.btn_save.configure(state="normal")
         self.status_var.set(
-            f"Messung gestoppt – {len(self.data_values)} Punkte aufgenommen")
-
-    def _measure_loop(self, interval_ms: int):
-        t0 = time.time()
-        while self.running:
-            t_start = time.time()
-            val = self.dmm.measure()
-            elapsed = time.time() - t0
-            self.data_queue.put((elapsed, val))
-            sleep_time = (interval_ms / 1000.0) - (time.time() - t_start)
+            f"Messung gestoppt – {self._count} Punkte aufgenommen")
+
+    def _measure_loop(self, interval_ms: int, t_start: float,
+                      stop: threading.Event):
+        # Kurze Intervalle blockweise lesen: eine Übertragung für n Werte
+        n = max(1, min(10, self.BLOCK_MS // interval_ms))
+        # Zeitstempel aus dem Messraster t_start + k·dt statt Uhrzeit je
+        # Wert: ein perf_counter pro Durchlauf, monotone und driftfreie
+        # Zeitachse, auch über mehrere Starts hinweg
+        dt = interval_ms / 1000.0
+        t0 = time.perf_counter()
+        k = 0               # Rasterindex des nächsten Messwerts
+        while not stop.is_set():
+            if n == 1:
+                self.data_queue.append((t_start + k * dt, self.dmm.measure()))
+            else:
+                # Das Gerät taktet die Werte im Abstand dt
+                vals = self.dmm.measure_block(n, dt)
+                self.data_queue.extend(
+                    zip([t_start + (k + i) * dt for i in range(n)],
+                        vals.tolist()))
+            k += n
+            sleep_time = t0 + k * dt - time.perf_counter()
+            if sleep_time <= 0:
+                # Messung hat das Intervall überschritten → verpasste
+                # Rasterpunkte überspringen und auf den nächsten warten
+                skip = math.ceil(-sleep_time / dt)
+                k += skip
+                sleep_time += skip * dt
             if sleep_time > 0:
-                time.sleep(sleep_time)
-
-    def _update_plot_loop(self):
-        """Wird im Haupt-Thread aufgerufen; liest aus Queue und aktualisiert Plot."""
-        changed = False
-        try:
-            maxpts = int(self.maxpts_var.get())
-        except ValueError:
-            maxpts = 1000
-
-        while not self.data_queue.empty():
-            t, v = self.data_queue.get_nowait()
-            self.data_timestamps.append(t)
-            self.data_values.append(v)
-            changed = True
-
-        if changed and self.data_values:
-            # Begrenzen
-            if len(self.data_values) > maxpts:
-                self.data_timestamps = self.data_timestamps[-maxpts:]
-                self.data_values = self.data_values[-maxpts:]
-
-            v = self.data_values[-1]
-            unit = Multimeter34401A.UNITS.get(self.func_var.get(), "")
-            self.display_value.set(f"{v:>+14.7g}")
+                stop.wait(sleep_time)
+
+    def _animate_frame(self, frame):
+        """Animationsschritt im Haupt-Thread; liest aus Queue und aktualisiert Plot."""
+        maxpts = self._maxpts_cached
+        if maxpts != self._cap:
+            self._resize_buffers(maxpts)
+
+        # Ist der Mess-Thread beendet, liegen alle restlichen Werte bereits
+        # in der Queue → Live-Datei nach diesem Block abschließen
+        finish = (self._live is not None and not self.running
+                  and (self.measure_thread is None
+                       or not self.measure_thread.is_alive()))
+        items = self._drain()
+        if self._live is not None:
+            self._live_write(items, finish)
+        changed = self._append_samples(items)
+
+        if changed and self._count:
+            v = self._val_buf[(self._head - 1) % self._cap]
+            unit = self._unit_cached
+            # Display höchstens alle 200 ms und nur bei geänderter Anzeige
+            now = time.perf_counter()
+            if now - self._last_disp_t >= 0.2 or not self.running:
+                self._last_disp_t = now
+                disp = format(v, "+14.7g")
+                if disp != self._last_disp_str:
+                    self.display_value_lbl.configure(text=disp)
+                    self._last_disp_str = disp
 
             # Plot
-            self.line.set_data(self.data_timestamps, self.data_values)
-
-            if self.autoscale_var.get():
-                self.ax.relim()
-                self.ax.autoscale_view()
-            else:
-                tmin, tmax = min(self.data_timestamps), max(self.data_timestamps)
-                vmin, vmax = min(self.data_values), max(self.data_values)
+            ts = self._ordered(self._ts_buf, self._plot_t)
+            vals = self._ordered(self._val_buf, self._plot_v)
+            self.line.set_data(*self._decimate(ts, vals, self.ax.bbox.width))
+            old_lims = (self.ax.get_xlim(), self.ax.get_ylim())
+
+            tmin, tmax = ts[0], ts[-1]
+            vmin, vmax = self._ymin, self._ymax
+            if self._autoscale_cached:
+                xlim = self._rescaled_lims(tmin, tmax, old_lims[0], 0.02, 0.25)
+                if xlim:
+                    self.ax.set_xlim(xlim)
+                if vmin <= vmax:
+                    ylim = self._rescaled_lims(vmin, vmax, old_lims[1], 0.1, 0.1)
+                    if ylim:
+                        self.ax.set_ylim(ylim)
+            elif vmin <= vmax:
                 margin = (vmax - vmin) * 0.05 if vmax != vmin else abs(vmax) * 0.05
                 self.ax.set_xlim(tmin, tmax if tmax > tmin else tmin + 1)
                 self.ax.set_ylim(vmin - margin, vmax + margin)
 
             # Statistik
-            if self.statistics_var.get() and len(self.data_values) >= 2:
-                arr = np.array(self.data_values)
-                txt = (f"n = {len(arr)}\n"
-                       f"μ = {arr.mean():.6g} {unit}\n"
-                       f"σ = {arr.std():.4g} {unit}\n"
-                       f"min = {arr.min():.6g} {unit}\n"
-                       f"max = {arr.max():.6g} {unit}")
+            if self._statistics_cached and self._count >= 2:
+                mean, std = self._mean_std()
+                txt = (f"n = {self._count}\n"
+                       f"μ = {mean:.6g} {unit}\n"
+                       f"σ = {std:.4g} {unit}\n"
+                       f"min = {self._ymin:.6g} {unit}\n"
+                       f"max = {self._ymax:.6g} {unit}")
+            else:
+                txt = ""
+            # Text nur bei Änderung neu setzen (erspart das Neu-Layouten)
+            if txt != self._stat_txt:
                 self.stat_text.set_text(txt)
+                self._stat_txt = txt
+
+            if (self.ax.get_xlim(), self.ax.get_ylim()) != old_lims:
+                # Achsen geändert → Hintergrund ohne Messkurve neu rendern;
+                # FuncAnimation sichert ihn für die neue Ansicht
+                self.canvas.draw()
+
+        # Takt an das Messintervall anpassen, ohne neue Daten zurücknehmen
+        if not self.running:
+            delay = 500
+        else:
+            delay = max(50, min(self._interval_cached // 2, 200))
+            if not changed:
+                delay = min(delay * 2, 500)
+        self._frame_delay = delay
+        if not self._delay_hooked:
+            # FuncAnimation setzt nach jedem Schritt das Timer-Intervall auf
+            # seinen Startwert zurück. Sein Schritt ist beim ersten Bild schon
+            # am Timer registriert, ein jetzt angehängter Callback läuft also
+            # danach, und der Timer plant mit dessen Wert neu
+            self._anim_timer.add_callback(self._apply_frame_delay)
+            self._delay_hooked = True
+        if (not self.running and not items and not self.data_queue
+                and self._live is None and not self._anim_paused
+                and (self.measure_thread is None
+                     or not self.measure_thread.is_alive())):
+            # Messung beendet und alles übernommen → Animation anhalten,
+            # statt im Leerlauf weiter zu blitten. Erst nach diesem Schritt,
+            # sonst markiert FuncAnimation die Artists gleich wieder animiert
+            self._anim_paused = True
+            self.after_idle(self._pause_animation)
+        # Immer zurückgeben: ohne Artists zeichnet FuncAnimation die ganze Figur
+        return self.line, self.stat_text
+
+    def _pause_animation(self):
+        # Es kann inzwischen schon wieder gestartet worden sein
+        if self.running:
+            self._anim_paused = False
+            return
+        # pause() nimmt die animated-Markierung zurück: Vollbild-Zeichnen
+        # (Zoom, Größenänderung) enthält die Kurve dann wieder
+        self._anim.pause()
+
+    def _resume_animation(self):
+        if self._anim_paused:
+            self._anim_paused = False
+            self._anim.resume()
+
+    def _apply_frame_delay(self):
+        self._anim_timer.interval = self._frame_delay
+
+    def _drain(self) -> list:
+        """Alle bis jetzt wartenden Messwerte entnehmen; später angehängte
+        bleiben für den nächsten Aufruf liegen."""
+        q = self.data_queue
+        return [q.popleft() for _ in range(len(q))]
+
+    # ── Ringpuffer ──────────────────────────────────────────────────────────
+
+    def _append_samples(self, items) -> bool:
+        """Messwerte in den Ringpuffer schreiben; Min/Max sowie μ/σ (Welford,
+        inkl. Herausnehmen überschriebener Werte) laufend mitführen.
+        NaN = fehlgeschlagene Messung zählt nicht mit."""
+        cap, ts_buf, val_buf = self._cap, self._ts_buf, self._val_buf
+        rescan = False
+        for t, v in items:
+            h = self._head
+            if self._count == len(ts_buf) < cap:
+                self._grow_buffers()
+                ts_buf, val_buf = self._ts_buf, self._val_buf
+            if self._count == cap:
+                # Ältester Wert wird überschrieben
+                old = val_buf[h]
+                if old == old:
+                    n = self._nfin = self._nfin - 1
+                    if n:
+                        d = old - self._mean
+                        self._mean -= d / n
+                        self._m2 -= d * (old - self._mean)
+                    else:
+                        self._mean = self._m2 = 0.0
+                    if old <= self._ymin or old >= self._ymax:
+                        rescan = True
+                self._evicted += 1
             else:
-                self.stat_text.set_text("")
+                self._count += 1
+            ts_buf[h] = t
+            val_buf[h] = v
+            self._head = (h + 1) % cap
+            if v == v:
+                n = self._nfin = self._nfin + 1
+                d = v - self._mean
+                self._mean += d / n
+                self._m2 += d * (v - self._mean)
+                if v < self._ymin:
+                    self._ymin = v
+                if v > self._ymax:
+                    self._ymax = v
+        if self._evicted >= cap:
+            # Rundungsfehler der Akkumulatoren einmal pro Pufferumlauf verwerfen
+            self._refresh_stats()
+        elif rescan:
+            # Min/Max nur neu bestimmen, wenn ein Extremwert herausfiel
+            self._refresh_minmax()
+        return bool(items)
+
+    def _mean_std(self):
+        n = self._nfin
+        if not n:
+            return math.nan, math.nan
+        return self._mean, math.sqrt(max(self._m2 / n, 0.0))
+
+    def _ordered(self, buf, out=None):
+        """Gültige Pufferwerte in zeitlicher Reihenfolge (alt → neu).
+
+        Ohne Umlauf ist das Ergebnis eine Sicht auf `buf`; nach dem Umlauf
+        wird in `out` (falls angegeben) statt in ein neues Array kopiert.
+        """
+        if self._count < self._cap:
+            return buf[:self._count]
+        h = self._head
+        if h == 0:
+            return buf
+        if out is None:
+            return np.concatenate((buf[h:], buf[:h]))
+        n1 = self._cap - h
+        out[:n1] = buf[h:]
+        out[n1:] = buf[:h]
+        return out
+
+    def _ts_view(self):
+        return self._ordered(self._ts_buf)
+
+    def _values_view(self):
+        return self._ordered(self._val_buf)
+
+    def _resize_buffers(self, cap: int):
+        """Neue Kapazität anlegen; die jüngsten Werte bleiben erhalten."""
+        keep = min(self._count, cap)
+        ts, vals = self._ts_view()[-keep:], self._values_view()[-keep:]
+        size = min(cap, max(keep, self.BUF_MIN))
+        self._cap, self._count, self._head = cap, keep, keep % cap
+        self._ts_buf = np.empty(size, dtype=np.float64)
+        self._val_buf = np.empty(size, dtype=np.float64)
+        self._alloc_plot_buffers(size == cap)
+        if keep:
+            self._ts_buf[:keep] = ts
+            self._val_buf[:keep] = vals
+        self._refresh_stats()
+
+    def _grow_buffers(self):
+        """Puffer verdoppeln (höchstens auf _cap); nur vor dem ersten Umlauf."""
+        n = self._count
+        size = min(2 * n, self._cap)
+        for name in ("_ts_buf", "_val_buf"):
+            buf = np.empty(size, dtype=np.float64)
+            buf[:n] = getattr(self, name)[:n]
+            setattr(self, name, buf)
+        self._alloc_plot_buffers(size == self._cap)
+
+    def _alloc_plot_buffers(self, full: bool):
+        if full:
+            self._plot_t = np.empty(self._cap, dtype=np.float64)
+            self._plot_v = np.empty(self._cap, dtype=np.float64)
+        else:
+            self._plot_t = self._plot_v = None
+
+    def _refresh_stats(self):
+        vals = self._val_buf[:self._count]
+        fin = vals[np.isfinite(vals)]
+        self._nfin = fin.size
+        self._mean = float(fin.mean()) if fin.size else 0.0
+        dev = fin - self._mean
+        self._m2 = float(np.dot(dev, dev))
+        self._evicted = 0
+        self._refresh_minmax()
+
+    def _refresh_minmax(self):
+        vals = self._val_buf[:self._count]
+        # fmin/fmax ignorieren NaN (fehlgeschlagene Messungen)
+        self._ymin = float(np.fmin.reduce(vals, initial=math.inf))
+        self._ymax = float(np.fmax.reduce(vals, initial=-math.inf))
 
-            self.canvas.draw_idle()
+    @staticmethod
+    def _decimate(ts, vals, n_px):
+        """Min/Max je Pixelspalte, damit höchstens ~2·n_px Punkte gezeichnet
+        werden; das Kurvenbild bleibt dabei unverändert. `ts` ist aufsteigend
+        (siehe t_start in _start_measurement)."""
+        n_px = max(int(n_px), 1)
+        if ts.size <= 2 * n_px:
+            return ts, vals
+        edges = np.linspace(ts[0], ts[-1], n_px + 1)
+        idx = np.unique(np.searchsorted(ts, edges[:-1]))
+        out_t = np.repeat(ts[idx], 2)
+        out_v = np.empty_like(out_t)
+        out_v[0::2] = np.minimum.reduceat(vals, idx)
+        out_v[1::2] = np.maximum.reduceat(vals, idx)
+        return out_t, out_v
 
-        self.after(80, self._update_plot_loop)
+    @staticmethod
+    def _rescaled_lims(lo, hi, cur, margin_lo, margin_hi):
+        """Neue Achsengrenzen für [lo, hi] oder None, wenn `cur` noch passt.
+
+        Hysterese: Die Grenzen bleiben stehen, solange die Daten innerhalb
+        von `cur` (abzüglich 2 % Rand) liegen und mindestens die Hälfte des
+        Bereichs belegen. Erst dann wird mit Reserve neu skaliert.
+        """
+        cur_lo, cur_hi = cur
+        span = cur_hi - cur_lo
+        pad = 0.02 * span
+        if lo >= cur_lo + pad and hi <= cur_hi - pad and hi - lo >= 0.5 * span:
+            return None
+        d = hi - lo
+        if d <= 0:
+            d = abs(hi) * 0.1 or 1.0
+        new = (lo - margin_lo * d, hi + margin_hi * d)
+        return None if new == tuple(cur) else new
+
+    def _on_format_change(self):
+        # Dateiendung an das gewählte Format anpassen
+        base, _ = os.path.splitext(self.filename_var.get())
+        self.filename_var.set(f"{base}.{self.format_var.get()}")
 
     def _browse_file(self):
+        ext = self.format_var.get()
         path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel-Dateien", "*.xlsx"), ("Alle Dateien", "*.*")],
+            defaultextension=f".{ext}",
+            filetypes=[(self.EXPORT_FORMATS[ext][1], f"*.{ext}"),
+                       ("Alle Dateien", "*.*")],
             initialfile=self.filename_var.get())
         if path:
             self.filename_var.set(path)
@@ -655,147 +1619,202 @@ class MultimeterApp(tk.Tk):
             messagebox.showwarning("Warnung",
                                    "Messung zuerst stoppen, dann Daten löschen.")
             return
-        self.data_timestamps.clear()
-        self.data_values.clear()
+        self._head = self._count = 0
+        self._refresh_stats()
         self.line.set_data([], [])
         self.ax.relim()
         self.ax.autoscale_view()
         self.stat_text.set_text("")
+        self._stat_txt = ""
         self.canvas.draw_idle()
-        self.display_value.set("- - - - - -")
+        self.display_value_lbl.configure(text="- - - - - -")
+        self._last_disp_str = ""
         self.btn_save.configure(state="disabled")
         self.status_var.set("Daten gelöscht")
 
     # ── Excel-Export ────────────────────────────────────────────────────────
 
     def _save_excel(self):
-        if not self.data_values:
+        if not self._count:
             messagebox.showinfo("Keine Daten", "Es wurden keine Messdaten aufgenommen.")
             return
-        if not OPENPYXL_AVAILABLE:
+        fmt = self.format_var.get()
+        if fmt == "xlsx" and not (XLSXWRITER_AVAILABLE or OPENPYXL_AVAILABLE):
             messagebox.showerror("Fehler", "Modul 'openpyxl' nicht installiert.\n"
                                            "Bitte: pip install openpyxl")
             return
+        if fmt == "parquet" and not PYARROW_AVAILABLE:
+            messagebox.showerror("Fehler", "Modul 'pyarrow' nicht installiert.\n"
+                                           "Bitte: pip install pyarrow")
+            return
 
         path = self.filename_var.get()
         if not path:
             messagebox.showwarning("Dateiname fehlt", "Bitte einen Dateinamen eingeben.")
             return
 
+        # Daten im Haupt-Thread kopieren, geschrieben wird im Hintergrund
+        writers = {"xlsx": self._write_excel, "csv": self._write_csv,
+                   "parquet": self._write_parquet}
         try:
-            self._write_excel(path)
-            messagebox.showinfo("Gespeichert",
-                                f"Datei erfolgreich gespeichert:\n{path}")
-            self.status_var.set(f"Gespeichert: {path}")
+            jobs = writers[fmt](path)
         except Exception as e:
             messagebox.showerror("Speicherfehler", str(e))
+            return
 
-    def _write_excel(self, path: str):
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Messdaten"
-
-        func = self.func_var.get()
-        unit = Multimeter34401A.UNITS.get(func, "")
-        now = datetime.datetime.now()
+        paths = [p for p, _ in jobs]
+        self.btn_save.configure(state="disabled")
+        self.status_var.set("Speichere …")
+        self._run_background(lambda: self._save_worker(jobs),
+                             lambda _, err: self._save_done(paths, err))
 
-        # ── Kopf ────────────────────────────────────────────────────────────
-        header_fill = PatternFill("solid", fgColor="1e3a5f")
-        header_font = Font(name="Calibri", bold=True, color="FFFFFF", size=11)
-        title_font  = Font(name="Calibri", bold=True, color="89B4FA", size=14)
+    @staticmethod
+    def _save_worker(jobs: list):
+        """Läuft im Hintergrund-Thread: jede Datei direkt in `<pfad>.tmp`
+        streamen (die Writer halten sie so nicht ganz im Speicher) und
+        danach atomar ersetzen."""
+        for path, write in jobs:
+            tmp = path + ".tmp"
+            try:
+                with open(tmp, "wb", buffering=1 << 20) as f:
+                    write(f)
+                os.replace(tmp, path)
+            except Exception:
+                # Keine halbfertige Datei liegen lassen
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
 
-        ws["A1"] = "HP/Agilent 34401A – Messung"
-        ws["A1"].font = title_font
-        ws.merge_cells("A1:E1")
+    def _save_done(self, paths: list, error: Exception):
+        if self._count and not self.running:
+            self.btn_save.configure(state="normal")
+        if error is not None:
+            self.status_var.set("Speichern fehlgeschlagen")
+            messagebox.showerror("Speicherfehler", str(error))
+            return
+        self.status_var.set(f"Gespeichert: {paths[0]}"
+                            + (f" (+{len(paths) - 1})" if len(paths) > 1 else ""))
+        messagebox.showinfo("Gespeichert",
+                            "Datei erfolgreich gespeichert:\n"
+                            + "\n".join(paths))
 
+    def _export_meta(self, now: datetime.datetime, n: int = None) -> list:
         meta = [
             ("Datum / Zeit:", now.strftime("%Y-%m-%d %H:%M:%S")),
-            ("Messfunktion:", func),
+            ("Messfunktion:", self.func_var.get()),
             ("Messbereich:", self.range_var.get()),
             ("Auflösung:", self.res_var.get()),
             ("Intervall (ms):", self.interval_var.get()),
-            ("Anzahl Punkte:", len(self.data_values)),
         ]
-        for i, (k, v) in enumerate(meta, start=2):
-            ws.cell(row=i, column=1, value=k).font = Font(bold=True, color="74C7EC")
-            ws.cell(row=i, column=2, value=str(v))
+        if n is not None:
+            meta.append(("Anzahl Punkte:", n))
+        return meta
+
+    def _write_csv(self, path: str) -> list:
+        # Ein einziger C-Aufruf ohne XML und Formatierung
+        unit = Multimeter34401A.UNITS.get(self.func_var.get(), "")
+        timestamps, values = self._ts_view(), self._values_view()
+        n = len(values)
+        meta = self._export_meta(datetime.datetime.now(), n)
+        header = "\n".join([EXPORT_TITLE]
+                           + [f"{k} {v}" for k, v in meta]
+                           + [f"#;Zeit (s);Messwert ({unit})"])
+        data = np.column_stack((np.arange(1, n + 1),
+                                timestamps - timestamps[0], values))
+        return [(path, lambda f: np.savetxt(
+            f, data, fmt=("%d", "%.4f", "%.9g"), delimiter=";",
+            header=header, encoding="utf-8"))]
+
+    def _write_parquet(self, path: str) -> list:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        func = self.func_var.get()
+        timestamps, values = self._ts_view(), self._values_view()
+        table = pa.table({"t": timestamps - timestamps[0], "v": values.copy()})
+        table = table.replace_schema_metadata({
+            "funktion": func,
+            "einheit": Multimeter34401A.UNITS.get(func, ""),
+            "bereich": self.range_var.get(),
+            "aufloesung": self.res_var.get(),
+            "intervall_ms": str(self.interval_var.get()),
+        })
+        return [(path, lambda f: pq.write_table(table, f))]
+
+    def _write_excel(self, path: str) -> list:
+        """Excel-Export; mehr als SEGMENT_ROWS Werte werden auf
+        `<name>_part1.xlsx`, `<name>_part2.xlsx`, … verteilt."""
+        n, seg = self._count, self.SEGMENT_ROWS
+        if n <= seg:
+            parts = [(path, slice(0, n))]
+        else:
+            base, ext = os.path.splitext(path)
+            parts = [(f"{base}_part{k + 1}{ext}", slice(start, start + seg))
+                     for k, start in enumerate(range(0, n, seg))]
+        # Geordnete Sicht einmal für alle Teile holen: nach dem Umlauf
+        # kopiert jeder Aufruf den ganzen Ringpuffer
+        all_ts, all_vals = self._ts_view(), self._values_view()
+        return [(part_path, lambda f, c=self._export_content(
+                    all_ts, all_vals, part, k, len(parts)):
+                 self._write_xlsx(f, c))
+                for k, (part_path, part) in enumerate(parts, start=1)]
+
+    def _export_content(self, all_ts: np.ndarray, all_vals: np.ndarray,
+                        part: slice, k: int = 1, parts: int = 1) -> dict:
+        """Inhalt eines Exportteils unabhängig vom Schreib-Backend aufbereiten.
+
+        `all_ts`/`all_vals` sind die geordneten Werte der gesamten Messung;
+        Zeiten und Index beziehen sich auf sie, die Statistik ebenfalls.
+        """
+        func = self.func_var.get()
+        unit = Multimeter34401A.UNITS.get(func, "")
+        now = datetime.datetime.now()
+        timestamps, values = all_ts[part], all_vals[part]
 
-        # ── Spaltentitel ────────────────────────────────────────────────────
-        header_row = len(meta) + 3
+        meta = self._export_meta(now, len(values))
+        if parts > 1:
+            meta.append(("Teil:", f"{k} / {parts}"))
         cols = ["#", "Zeit (s)", f"Messwert ({unit})", "Datum / Zeit"]
-        for col, txt in enumerate(cols, start=1):
-            cell = ws.cell(row=header_row, column=col, value=txt)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center")
-
-        # ── Daten ────────────────────────────────────────────────────────────
-        t0 = self.data_timestamps[0]
-        abs_t0 = now - datetime.timedelta(seconds=self.data_timestamps[-1])
-        thin = Side(style="thin", color="45475a")
-        border = Border(left=thin, right=thin, top=thin, bottom=thin)
-
-        for i, (ts, val) in enumerate(
-                zip(self.data_timestamps, self.data_values), start=1):
-            row = header_row + i
-            abs_time = abs_t0 + datetime.timedelta(seconds=ts)
-            ws.cell(row=row, column=1, value=i)
-            ws.cell(row=row, column=2, value=round(ts - t0, 4))
-            ws.cell(row=row, column=3, value=round(val, 9))
-            ws.cell(row=row, column=4, value=abs_time.strftime("%H:%M:%S.%f")[:-3])
-            for col in range(1, 5):
-                ws.cell(row=row, column=col).border = border
-                if i % 2 == 0:
-                    ws.cell(row=row, column=col).fill = PatternFill(
-                        "solid", fgColor="1e1e2e")
-
-        # ── Statistik ────────────────────────────────────────────────────────
-        arr = np.array(self.data_values)
-        stat_row = header_row + len(self.data_values) + 2
-        stats = [
-            ("Mittelwert (μ):", f"{arr.mean():.9g} {unit}"),
-            ("Std.-Abw. (σ):", f"{arr.std():.6g} {unit}"),
-            ("Minimum:",       f"{arr.min():.9g} {unit}"),
-            ("Maximum:",       f"{arr.max():.9g} {unit}"),
-            ("Peak-Peak:",     f"{arr.max()-arr.min():.6g} {unit}"),
+        first = part.start + 1
+
+        # Hier nur vektoriell umrechnen (das kopiert zugleich aus dem
+        # Ringpuffer); Listen und Uhrzeittexte entstehen erst beim Schreiben
+        # im Hintergrund-Thread
+        t0 = all_ts[0]
+        abs_t0 = np.datetime64(now, "us") - np.timedelta64(
+            round(all_ts[-1] * 1e6), "us")
+        rel_t = np.round(timestamps - t0, 4)
+        vals_r = np.round(values, 9)
+
+        # Laufend geführte Welford-Werte und Extremwerte des Ringpuffers nutzen:
+        # kein weiterer Durchlauf über die Daten, Werte wie im Diagramm
+        mean, std = self._mean_std()
+        mn, mx = (self._ymin, self._ymax) if self._nfin else (math.nan, math.nan)
+        stats = _stat_rows(mean, std, mn, mx, unit)
+
+        # Spaltenbreiten vorab bestimmen (Streaming-Writer brauchen sie vor
+        # der ersten Zeile). Die Datenspalten werden nicht durchlaufen: ihre
+        # längsten Einträge ergeben sich aus Anzahl, Zeitspanne und Min/Max
+        keys = [k for k, _ in meta + stats]
+        widths = [
+            _col_width([EXPORT_TITLE, cols[0], str(first + len(values) - 1),
+                        "Statistik"] + keys),
+            _col_width([str(v) for _, v in meta + stats]
+                       + [cols[1], f"{rel_t[-1]:.4f}"]),
+            _col_width([cols[2], f"{mn:.9g}", f"{mx:.9g}"]),
+            _col_width([cols[3], "HH:MM:SS.mmm"]),
         ]
-        ws.cell(row=stat_row, column=1, value="Statistik").font = Font(
-            bold=True, color="A6E3A1", size=11)
-        for j, (k, v) in enumerate(stats, start=1):
-            ws.cell(row=stat_row + j, column=1, value=k).font = Font(bold=True)
-            ws.cell(row=stat_row + j, column=2, value=v)
-
-        # ── Liniendiagramm ───────────────────────────────────────────────────
-        ws2 = wb.create_sheet("Diagramm")
-        # Daten für Chart in ws2 kopieren
-        ws2["A1"] = "Zeit (s)"
-        ws2["B1"] = f"Messwert ({unit})"
-        for i, (ts, val) in enumerate(
-                zip(self.data_timestamps, self.data_values), start=2):
-            ws2.cell(row=i, column=1, value=round(ts - t0, 4))
-            ws2.cell(row=i, column=2, value=round(val, 9))
-
-        chart = LineChart()
-        chart.title = f"{func} – Messverlauf"
-        chart.style = 10
-        chart.y_axis.title = f"Messwert ({unit})"
-        chart.x_axis.title = "Zeit (s)"
-        data_ref = Reference(ws2, min_col=2, min_row=1,
-                             max_row=len(self.data_values) + 1)
-        chart.add_data(data_ref, titles_from_data=True)
-        chart.width = 20
-        chart.height = 12
-        ws2.add_chart(chart, "D2")
 
-        # ── Spaltenbreiten anpassen ──────────────────────────────────────────
-        for ws_obj in (ws, ws2):
-            for col in ws_obj.columns:
-                max_len = max(
-                    (len(str(cell.value)) for cell in col if cell.value), default=0)
-                ws_obj.column_dimensions[col[0].column_letter].width = min(
-                    max_len + 4, 40)
+        return dict(func=func, unit=unit, meta=meta, cols=cols,
+                    first=first, rel_t=rel_t, vals_r=vals_r, abs_t0=abs_t0,
+                    timestamps=timestamps.copy(), stats=stats, widths=widths)
 
-        wb.save(path)
+    def _write_xlsx(self, f, c: dict):
+        writer = _xlsx_stream_writer(f, c["meta"], c["cols"], c["widths"])
+        writer.append_rows(c["first"], c["rel_t"].tolist(), c["vals_r"].tolist(),
+                           _clock_strings(c["abs_t0"], c["timestamps"]))
+        writer.close(c["stats"], c["func"], c["unit"], (c["rel_t"], c["vals_r"]))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -807,7 +1826,7 @@ if __name__ == "__main__":
     missing = []
     if not PYVISA_AVAILABLE:
         missing.append("pyvisa")
-    if not OPENPYXL_AVAILABLE:
+    if not (XLSXWRITER_AVAILABLE or OPENPYXL_AVAILABLE):
         missing.append("openpyxl")
     if missing:
         import sys
@@ -817,3 +1836,6 @@ if __name__ == "__main__":
 
     app = MultimeterApp()
     app.mainloop()
+    # Laufende und wartende Speicherungen (auch die Live-Datei) zu Ende
+    # schreiben
+    app._pool.shutdown(wait=True)